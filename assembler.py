@@ -1,18 +1,229 @@
 import os
 import sys
 import argparse
+import struct
+import bisect
+import functools
+import hashlib
+import io
+import re
+from array import array
+from enum import Enum
+from itertools import repeat
 from pathlib import Path
 import json
 from parser import Parser
+from errors import AssemblerError
+
+
+class InstructionMode(Enum):
+    ARM = 0
+    THUMB = 1
+
+
+_CODE_MODES = {"32": InstructionMode.ARM, "16": InstructionMode.THUMB}
+
+_CONDITIONS = {
+    "EQ": 0x0, "NE": 0x1, "CS": 0x2, "HS": 0x2, "CC": 0x3, "LO": 0x3, "MI": 0x4, "PL": 0x5,
+    "VS": 0x6, "VC": 0x7, "HI": 0x8, "LS": 0x9, "GE": 0xA, "LT": 0xB, "GT": 0xC, "LE": 0xD,
+    "AL": 0xE, "": 0xE
+}
+
+_DATA_FORMATS = {1: "B", 2: "H", 4: "I"}
+_pack_word = struct.Struct("<I").pack
+_PACKERS = {1: struct.Struct("<B").pack, 2: struct.Struct("<H").pack, 4: _pack_word}
+
+# Only meaningful to a linker/debugger, nothing to do
+_NOOP_DIRECTIVES = frozenset(sys.intern(directive) for directive in (
+    ".TEXT", ".DATA", ".SECTION", ".GLOBAL", ".GLOBL", ".EXTERN", ".TYPE", ".SIZE", ".FILE",
+    ".FUNC", ".ENDFUNC", ".STABS", ".LIST", ".NOLIST", ".TITLE", ".SBTTL", ".PSIZE", ".EJECT",
+))
+
+# Recognised, but not supported yet
+_NOT_IMPLEMENTED = frozenset(sys.intern(directive) for directive in (
+    ".IF", ".IFDEF", ".IFNDEF", ".ELSE", ".ELSEIF", ".ENDIF",
+    ".MACRO", ".ENDM", ".EXITM", ".REPT", ".IRP", ".IRPC", ".ENDR",
+    ".SET", ".EQU", ".EQUIV", ".REQ", ".UNREQ",
+    ".ASCII", ".ASCIZ", ".STRING", ".SPACE", ".SKIP", ".FILL",
+    ".SHORT", ".LONG", ".INT", ".QUAD", ".FLOAT", ".DOUBLE",
+    ".BALIGN", ".BALIGNW", ".BALIGNL", ".P2ALIGN", ".ORG", ".LTORG", ".POOL", ".END",
+))
+
+# Same rule the parser uses for label definitions, so a reference that can't be a label is reported where it's used
+_is_label_name = re.compile(r'[A-Za-z_]\w*').fullmatch
+
+_REGISTERS = {**{f"R{i}": i for i in range(16)}, "SP": 13, "LR": 14, "PC": 15}
+
+_SHIFTS = {"LSL": 0b00, "LSR": 0b01, "ASR": 0b10, "ROR": 0b11}
+
+# Mnemonic -> (opcode, register operands before Operand2)
+_DATA_PROCESSING = {
+    "AND": (0x0, ("Rd", "Rn")), "EOR": (0x1, ("Rd", "Rn")), "SUB": (0x2, ("Rd", "Rn")), "RSB": (0x3, ("Rd", "Rn")),
+    "ADD": (0x4, ("Rd", "Rn")), "ADC": (0x5, ("Rd", "Rn")), "SBC": (0x6, ("Rd", "Rn")), "RSC": (0x7, ("Rd", "Rn")),
+    "TST": (0x8, ("Rn",)),      "TEQ": (0x9, ("Rn",)),      "CMP": (0xA, ("Rn",)),      "CMN": (0xB, ("Rn",)),
+    "ORR": (0xC, ("Rd", "Rn")), "MOV": (0xD, ("Rd",)),      "BIC": (0xE, ("Rd", "Rn")), "MVN": (0xF, ("Rd",)),
+}
+
+_REG_SHIFTS = {"Rd": 12, "Rn": 16}
+
+
+# Encoding helpers raise ValueError, which the assembler reports against the offending line
+def _reg(token):
+    reg = _REGISTERS.get(token.upper())
+    if reg is None:
+        raise ValueError(f"Invalid register {token}")
+    return reg
+
+
+def _imm(token):
+    if token[:1] != '#':
+        raise ValueError(f"Expected an immediate value, e.g. #1, got {token}")
+    try:
+        return int(token[1:], 0)
+    except ValueError:
+        raise ValueError(f"Invalid immediate value {token}") from None
+
+
+def _rotated_imm(value):
+    # Immediates are an 8 bit value rotated right by an even amount
+    value &= 0xFFFFFFFF
+    for rot in range(16):
+        imm8 = (value << (2 * rot) | value >> (32 - 2 * rot)) & 0xFFFFFFFF
+        if imm8 < 0x100:
+            return rot << 8 | imm8
+    raise ValueError(f"Immediate value {value:#x} can't be encoded as a rotated 8 bit value")
+
+
+def _operand2(ops):
+    # Returns the I bit and shifter operand bits for "#imm", "Rm", "Rm, <shift> #n", "Rm, <shift> Rs" or "Rm, RRX"
+    if ops[0][:1] == '#':
+        if len(ops) != 1:
+            raise ValueError("Unexpected operands after immediate value")
+        return 1 << 25 | _rotated_imm(_imm(ops[0]))
+
+    rm = _reg(ops[0])
+    if len(ops) == 1:
+        return rm
+    if len(ops) > 3:
+        raise ValueError("Too many operands")
+
+    # The amount may or may not be separated from the shift, e.g. "LSL #2" or "LSL#2"
+    shift = "".join(ops[1:])
+    if shift.upper() == "RRX":
+        return _SHIFTS["ROR"] << 5 | rm
+
+    shift_type = _SHIFTS.get(shift[:3].upper())
+    if shift_type is None:
+        raise ValueError(f"Invalid shift {' '.join(ops[1:])}")
+
+    amount = shift[3:]
+    if amount[:1] != '#':
+        return _reg(amount) << 8 | shift_type << 5 | 1 << 4 | rm
+
+    # A zero amount means LSR/ASR #32 or RRX to the CPU, so any shift by 0 is encoded as LSL #0 instead. That frees up
+    # LSR/ASR #32 to be encoded as 0
+    amount = _imm(amount)
+    if amount == 0:
+        shift_type = _SHIFTS["LSL"]
+    elif amount == 32 and shift_type in (_SHIFTS["LSR"], _SHIFTS["ASR"]):
+        amount = 0
+    elif not 0 < amount < 32:
+        raise ValueError(f"Shift amount {amount} out of range")
+    return amount << 7 | shift_type << 5 | rm
+
+
+def _data_processing(cond, opcode, set_flags, regs):
+    fixed = cond << 28 | opcode << 21 | set_flags << 20
+    shifts = [_REG_SHIFTS[reg] for reg in regs]
+
+    def encode(assembler, operands, line_num):
+        if len(operands) <= len(regs):
+            raise ValueError(f"Expected operands {', '.join(regs)}, Operand2")
+
+        word = fixed | _operand2(operands[len(regs):])
+        for shift, token in zip(shifts, operands):
+            word |= _reg(token) << shift
+
+        assembler._emit_word(word)
+
+    return encode
+
+
+def _branch(cond, link):
+    def encode(assembler, operands, line_num):
+        assembler._emit_branch(operands, line_num, cond, link)
+
+    return encode
+
+
+def _build_mnemonic_encoders():
+    encoders = {}
+
+    for cond, cond_code in _CONDITIONS.items():
+        for mnemonic, (opcode, regs) in _DATA_PROCESSING.items():
+            # Comparisons always set the flags. Both the UAL (ADDSEQ) and pre-UAL (ADDEQS) orders are accepted
+            if regs == ("Rn",):
+                encoders[mnemonic + cond] = _data_processing(cond_code, opcode, 1, regs)
+            else:
+                encoders[mnemonic + cond] = _data_processing(cond_code, opcode, 0, regs)
+                encoders[mnemonic + "S" + cond] = _data_processing(cond_code, opcode, 1, regs)
+                encoders[mnemonic + cond + "S"] = encoders[mnemonic + "S" + cond]
+
+        encoders[f"BL{cond}"] = _branch(cond_code, 1)
+
+    # Added last so BLS/BLE/BLT are conditional branches, not BL
+    for cond, cond_code in _CONDITIONS.items():
+        encoders[f"B{cond}"] = _branch(cond_code, 0)
+
+    return {sys.intern(mnemonic): encoder for mnemonic, encoder in encoders.items()}
+
+
+# Built once at import, encoding an instruction is then a single lookup. Encoders take (assembler, operands, line_num)
+_MNEMONIC_ENCODERS = _build_mnemonic_encoders()
+
+
+# Largest power accepted by .ALIGN, anything bigger would write an absurd amount of padding
+_MAX_ALIGN_POWER = 15
+
+
+@functools.lru_cache(maxsize=None)
+def _alignment_value(power):
+    # Programs only ever use a handful of alignments, so the parse and power are only worked out once each
+    if not power.isdecimal():
+        raise ValueError(f"Expected a power of two, e.g. .ALIGN 2, got {power}")
+    if int(power) > _MAX_ALIGN_POWER:
+        raise ValueError(f"Alignment power {power} too large, at most {_MAX_ALIGN_POWER} is supported")
+    return 2 ** int(power)
+
+
+@functools.lru_cache(maxsize=None)
+def _tool_digest():
+    digest = hashlib.blake2b(digest_size=16)
+    for module in ("assembler.py", "parser.py", "errors.py"):
+        digest.update(Path(__file__).with_name(module).read_bytes())
+    return digest.digest()
+
+
+def _exit_with_error(msg, error_code=-1):
+    sys.stderr.write(f"{msg}\n")
+    sys.exit(error_code)
+
 
 class Assembler:
-    def __init__(self, verbose=False):
+    def __init__(self, verbose=False, use_cache=False):
         self._labels = {}
-        self._source = {}                           # Contains info on all source code encountered
+        self._label_pcs = array('I')                # Label addresses in definition order, sorted since the PC only grows
+        self._label_names = []
+        self._source = None                         # Parsed source, with .INCLUDEd files already spliced in
         self._PC = 0
-        self._cur_file = None
+        self._out = None                            # Output binary, written as it's assembled
+        self._write = None                          # self._out.write, bound once since it's called for every value
+        self._pending_patches = []                  # Forward label references, fixed up once all labels are known
+        self._mode = InstructionMode.ARM
+        self._cur_file = None                       # Index into self._source.files of the line being assembled
         self._output_file_path = None
         self.verbose = verbose
+        self.use_cache = use_cache
 
     def _verbose_print(self, *msgs):
         if self.verbose:
@@ -24,34 +235,356 @@ class Assembler:
                 try:
                     self._output_file_path = f"{os.path.splitext(source_file)[0]}.out"
                 except Exception:
-                    print(f"ERROR: Invalid input file {source_file}")
-                    sys.exit(-1)
+                    _exit_with_error(f"ERROR: Invalid input file {source_file}")
             else:
                 # TODO Validate output path
                 self._output_file_path = output_file
 
         self._verbose_print(f"Output file set to {self._output_file_path}")
 
-        self.parser = Parser(source_file)
+        # With the cache on, the source and everything it includes is hashed, unchanged sources just get the previous
+        # output
+        cache_path = None
+        if self.use_cache:
+            try:
+                source_bytes = Path(source_file).read_bytes()
+            except OSError:
+                _exit_with_error(f"ERROR: Unable to open source file {source_file}")
+
+            cache_path = self._cache_path(source_file, source_bytes)
+            if self._load_cached(cache_path):
+                self._verbose_print(f"Sources unchanged, using cached output {cache_path}")
+                return
+
+        try:
+            self._source = Parser(source_file, digests=self.use_cache)
+        except OSError:
+            _exit_with_error(f"ERROR: Unable to open source file {source_file}")
+        except UnicodeDecodeError:
+            _exit_with_error(f"ERROR: Unable to decode source file {source_file}")
+        except AssemblerError as e:
+            _exit_with_error(str(e), e.code)
+
+        # Regular files are written to a temporary file next to the target, which replaces it only once assembly has
+        # succeeded, so a failed run never leaves a half written binary behind or touches whatever was there. Anything
+        # else, e.g. /dev/stdout or a pipe, can't be replaced or seeked back into to patch forward references, so the
+        # output is built in memory and written to it in one go
+        target = None
+        tmp_path = None
+        output = None
+        try:
+            if os.path.isfile(self._output_file_path) or not os.path.lexists(self._output_file_path):
+                # Replacing a symlink would swap it for a regular file, replace whatever it points at instead
+                target = os.path.realpath(self._output_file_path)
+                tmp_path = f"{target}.{os.getpid()}.tmp"
+                self._out = open(tmp_path, 'wb', buffering=1 << 20)
+            else:
+                self._out = io.BytesIO()
+            self._write = self._out.write
+        except OSError:
+            _exit_with_error(f"ERROR: Unable to write output file {self._output_file_path}")
+
+        # Labels are resolved as they're seen, forward references are patched once the whole source is known
+        try:
+            with self._out:
+                self._assemble_stream()
+                self._apply_patches()
+
+                if tmp_path is None:
+                    output = self._out.getvalue()
+                    with open(self._output_file_path, 'wb') as file:
+                        file.write(output)
+
+            if tmp_path is not None:
+                os.replace(tmp_path, target)
+        except AssemblerError as e:
+            if tmp_path is not None:
+                os.remove(tmp_path)
+            _exit_with_error(str(e), e.code)
+        except OSError:
+            if tmp_path is not None:
+                os.remove(tmp_path)
+            _exit_with_error(f"ERROR: Unable to write output file {self._output_file_path}")
 
-        # Extract labels
-        self._pass_one()
+        if cache_path is not None:
+            self._store_cached(cache_path, output)
 
-        # Translate instructions to binary
-        self._pass_two()
+    def _cache_path(self, source_file, source_bytes):
+        cache_dir = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
 
-        # Output binary
+        # The assembler's own code is part of the key so cached output doesn't outlive changes to it. So is where the
+        # source lives, since .INCLUDEs are relative to it and the same file elsewhere may include different files
+        digest = hashlib.blake2b(source_bytes, digest_size=16)
+        digest.update(os.path.abspath(source_file).encode())
+        digest.update(_tool_digest())
+        return os.path.join(cache_dir, "armv4t-asm", f"{digest.hexdigest()}.bin")
 
-    def _pass_one(self):
-        self._verbose_print(f"=== Starting first pass for {self._cur_file} ===")
+    def _load_cached(self, cache_path):
+        # Any problem with the cache just means assembling from scratch
+        try:
+            # An entry is a single line of JSON mapping each source file to its digest, followed by the raw output
+            header, _, output = Path(cache_path).read_bytes().partition(b"\n")
+            digests = json.loads(header)
 
-    def _pass_two(self):
-        # Turn assembly to binary...
-        self._verbose_print(f"=== Starting first pass for {self._cur_file} ===")
+            # The main source matched, but anything it includes may have changed since
+            for path, digest in digests.items():
+                if hashlib.blake2b(Path(path).read_bytes(), digest_size=16).hexdigest() != digest:
+                    return False
+
+            with open(self._output_file_path, 'wb') as file:
+                file.write(output)
+        except (OSError, ValueError):
+            return False
+
+        return True
+
+    def _store_cached(self, cache_path, output=None):
+        try:
+            # Output written to a regular file is read back, output sent anywhere else was kept in memory
+            header = json.dumps(self._source.digests).encode()
+            if output is None:
+                output = Path(self._output_file_path).read_bytes()
+
+            # Written to a temporary file first so a concurrent run never sees a partial entry
+            os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+            tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+            with open(tmp_path, 'wb') as file:
+                file.write(header + b"\n" + output)
+            os.replace(tmp_path, cache_path)
+        except OSError:
+            self._verbose_print(f"Unable to write cache entry {cache_path}")
+
+    def _assemble_stream(self):
+        src = self._source
+        files = src.files
+        cur_file = None
+
+        # Looked up once rather than on every iteration
+        labels = self._labels
+        label_pcs = self._label_pcs
+        label_names = self._label_names
+        error = self._error
+        verbose = self.verbose
+        verbose_print = self._verbose_print
+        handlers_get = self._DIRECTIVE_HANDLERS.get
+        noop_directives = _NOOP_DIRECTIVES
+        encoders_get = _MNEMONIC_ENCODERS.get
+        THUMB = InstructionMode.THUMB
+
+        for file_id, line_num, kind, head, operands in zip(
+                src.file_ids, src.line_nums, src.kinds, src.heads, src.operands):
+            if file_id != cur_file:
+                self._cur_file = cur_file = file_id
+                if verbose:
+                    verbose_print(f"=== Assembling {files[file_id]} ===")
+
+            # Checked here so the message isn't formatted at all unless it's printed
+            if verbose:
+                verbose_print(f"Parsing line {line_num}: {head} {operands}")
+
+            if kind == "label":
+                # Single lookup, the table only grows if the label is new. Comparing the returned address instead would
+                # miss a duplicate defined at the same PC
+                num_labels = len(labels)
+                labels.setdefault(head, self._PC)
+                if len(labels) == num_labels:
+                    error(line_num, f"{head} already defined.", -1)
+
+                label_pcs.append(self._PC)
+                label_names.append(head)
+
+            elif kind == "directive":
+                if head in noop_directives:
+                    continue
+
+                handler = handlers_get(head)
+                if handler is None:
+                    if head in _NOT_IMPLEMENTED:
+                        error(line_num, f"Directive {head} not implemented yet!", -1)
+                    error(line_num, f"Unknown directive {head}", -1)
+
+                handler(self, operands, line_num)
+
+            elif kind == "mnemonic":
+                if self._mode is THUMB:
+                    error(line_num, "THUMB instructions not implemented yet!", -1)
+
+                # ARM instructions have to start on a word boundary, e.g. not straight after an odd number of .BYTEs
+                if self._PC & 3:
+                    error(line_num, f"Instruction at {self._describe_pc(self._PC)} is not word aligned, "
+                                    "use .ALIGN 2", -1)
+
+                encoder = encoders_get(head)
+                if encoder is None:
+                    error(line_num, f"Instruction {head} not implemented yet!", -1)
+
+                try:
+                    encoder(self, operands, line_num)
+                except ValueError as e:
+                    error(line_num, str(e), -1)
+
+            else:
+                error(line_num, f"Invalid label name {head}", -1)
+
+    def _apply_patches(self):
+        for offset, pc, size, label_name, file, line_num, encode in self._pending_patches:
+            self._cur_file = file
+
+            target = self._labels.get(label_name)
+            if target is None:
+                self._error(line_num, f"Undefined label {label_name}", -1)
+
+            self._out.seek(offset)
+            self._out.write(_PACKERS[size](encode(pc, target)))
+
+        self._pending_patches.clear()
+
+    def _describe_pc(self, pc):
+        # Address relative to the closest label at or before it, e.g. "loop+0x8"
+        idx = bisect.bisect_right(self._label_pcs, pc) - 1
+        if idx < 0:
+            return hex(pc)
+
+        offset = pc - self._label_pcs[idx]
+        return f"{self._label_names[idx]}+{offset:#x}" if offset else self._label_names[idx]
 
     def _error(self, line_num, msg, error_code):
-        print(f"{self._cur_file}:{line_num}: ERROR: {msg}")
-        sys.exit(error_code)
+        raise AssemblerError(self._source.files[self._cur_file], line_num, msg, error_code)
+
+    def _emit(self, value, size=4):
+        # The PC doubles as the offset into the output file
+        offset = self._PC
+        self._write(_PACKERS[size](value))
+        self._PC += size
+        return offset
+
+    def _emit_word(self, word):
+        # Instructions are always a word, so skip the size lookup
+        self._write(_pack_word(word))
+        self._PC += 4
+
+    def _emit_with_label(self, line_num, label_name, encode, size=4):
+        # encode(pc, target) -> value. Labels that haven't been seen yet get a placeholder. Label definitions are
+        # interned by the parser, interning the reference too lets the lookup compare by identity
+        label_name = sys.intern(label_name)
+        target = self._labels.get(label_name)
+        if target is None:
+            pc = self._PC
+            offset = self._emit(0, size)
+            self._pending_patches.append((offset, pc, size, label_name, self._cur_file, line_num, encode))
+        else:
+            self._emit(encode(self._PC, target), size)
+
+    def _emit_branch(self, operands, line_num, cond, link):
+        if len(operands) != 1:
+            raise ValueError("Expected a label to branch to")
+
+        label_name = operands[0]
+        if not _is_label_name(label_name):
+            raise ValueError(f"Invalid label {label_name}")
+
+        def encode(pc, target):
+            # The PC is two instructions ahead when the branch executes
+            offset = target - (pc + 8)
+            if offset % 4:
+                self._error(line_num, f"Branch target {label_name} is not word aligned", -1)
+            if not -(1 << 25) <= offset < (1 << 25):
+                self._error(line_num, f"Branch from {self._describe_pc(pc)} to {label_name} out of range", -1)
+
+            return cond << 28 | 0b101 << 25 | link << 24 | (offset >> 2) & 0xFFFFFF
+
+        self._emit_with_label(line_num, label_name, encode)
+
+    def _emit_data(self, operands, line_num, size):
+        # Usually every value is a non-negative number that fits, then they can be converted and packed without a
+        # Python level loop. Labels, negative numbers and out of range values fail the fast path and are handled below
+        try:
+            data = struct.pack(f"<{len(operands)}{_DATA_FORMATS[size]}", *map(int, operands, repeat(0)))
+        except (ValueError, struct.error):
+            pass
+        else:
+            self._write(data)
+            self._PC += len(data)
+            return
+
+        # Runs of plain numbers are packed and written in one go, only label references are emitted individually
+        values = []
+        for token in operands:
+            try:
+                values.append(self._fit(line_num, int(token, 0), size))
+            except ValueError:
+                # Address of a label, e.g. a jump table
+                if not _is_label_name(token):
+                    self._error(line_num, f"Invalid value {token}", -1)
+
+                self._emit_values(values, size)
+                values = []
+                self._emit_with_label(line_num, token, lambda pc, target: self._fit(line_num, target, size), size)
+
+        self._emit_values(values, size)
+
+    def _emit_values(self, values, size):
+        if values:
+            self._write(struct.pack(f"<{len(values)}{_DATA_FORMATS[size]}", *values))
+            self._PC += len(values) * size
+
+    def _fit(self, line_num, value, size):
+        bits = size * 8
+        if not -(1 << (bits - 1)) <= value < (1 << bits):
+            self._error(line_num, f"Value {value} does not fit in {size} byte(s)", -1)
+
+        return value & ((1 << bits) - 1)
+
+    def _calc_padding(self, operands, line_num):
+        if len(operands) != 1:
+            self._error(line_num, "Expected a power of two, e.g. .ALIGN 2", -1)
+
+        try:
+            alignment = _alignment_value(operands[0])
+        except ValueError as e:
+            self._error(line_num, str(e), -1)
+
+        return -self._PC % alignment
+
+    # === Directive handlers ===
+    def _h_arm(self, operands, line_num):
+        self._mode = InstructionMode.ARM
+
+    def _h_thumb(self, operands, line_num):
+        self._mode = InstructionMode.THUMB
+
+    def _h_code(self, operands, line_num):
+        mode = _CODE_MODES.get(operands[0]) if len(operands) == 1 else None
+        if mode is None:
+            self._error(line_num, "Expected .CODE 16 or .CODE 32", -1)
+
+        self._mode = mode
+
+    def _h_align(self, operands, line_num):
+        # Most .ALIGNs are already aligned, there's nothing to write then
+        padding = self._calc_padding(operands, line_num)
+        if padding:
+            self._write(bytes(padding))
+            self._PC += padding
+
+    def _h_byte(self, operands, line_num):
+        self._emit_data(operands, line_num, 1)
+
+    def _h_hword(self, operands, line_num):
+        self._emit_data(operands, line_num, 2)
+
+    def _h_word(self, operands, line_num):
+        self._emit_data(operands, line_num, 4)
+
+    _DIRECTIVE_HANDLERS = {sys.intern(directive): handler for directive, handler in {
+        ".ARM":     _h_arm,
+        ".THUMB":   _h_thumb,
+        ".CODE":    _h_code,
+        ".ALIGN":   _h_align,
+        ".BYTE":    _h_byte,
+        ".HWORD":   _h_hword,
+        ".WORD":    _h_word,
+    }.items()}
 
 
 def main():
@@ -84,9 +617,18 @@ def main():
         dest="verbose"
     )
 
+    parser.add_argument(
+        "--cache",
+        required=False,
+        default=False,
+        help="Reuse the output of unchanged sources, cached under $XDG_CACHE_HOME/armv4t-asm.",
+        action="store_true",
+        dest="use_cache"
+    )
+
     args = parser.parse_args()
 
-    Assembler(verbose=args.verbose).assemble(
+    Assembler(verbose=args.verbose, use_cache=args.use_cache).assemble(
         source_file=args.source_file,
         output_file=args.output_file
     )
@@ -0,0 +1,11 @@
+class AssemblerError(Exception):
+    def __init__(self, file, line, msg, code):
+        super().__init__(file, line, msg, code)
+        self.file = file
+        self.line = line
+        self.msg = msg
+        self.code = code
+
+    def __str__(self):
+        # Only formatted if it's actually reported
+        return f"{self.file}:{self.line}: ERROR: {self.msg}"
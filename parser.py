@@ -0,0 +1,167 @@
+import hashlib
+import os
+import re
+import sys
+from array import array
+from pathlib import Path
+from errors import AssemblerError
+
+
+# Operands are separated by commas and/or whitespace. Turning the commas into spaces lets str.split() do the rest,
+# which is cheaper than a regex split and never produces empty tokens
+_COMMAS_TO_SPACES = str.maketrans(',', ' ')
+
+# Classifies the first word of a line. Labels are validated structurally, so a
+# malformed label such as "1abc:" won't match at all.
+_LINE_RE = re.compile(r'(?:(?P<label>[A-Za-z_]\w*):|(?P<directive>\.\w+)|(?P<mnemonic>[^\s:]+))(?!\S)')
+
+
+_INCLUDE = sys.intern(".INCLUDE")
+
+
+def _parse_lines(data):
+    # Splits source text into parallel columns (line_nums, kinds, heads, operands). Kept free of any Parser/Assembler
+    # state so it can be run on any text, and compiled separately should parsing ever become the bottleneck.
+    line_nums = array('I')
+    kinds = []
+    heads = []
+    operands = []
+
+    # Bound once instead of looking up the module globals and methods on every line
+    match_line = _LINE_RE.match
+    commas_to_spaces = _COMMAS_TO_SPACES
+    intern = sys.intern
+
+    for line_num, line in enumerate(data.splitlines(), 1):
+        # Strip comments
+        line = line.partition("//")[0].strip()
+        if not line:
+            continue
+
+        # A label can share its line with what it labels, e.g. "loop: ADD R0, R0, #1". The label gets its own entry and
+        # the rest of the line is classified as if it were on a line of its own
+        m = match_line(line)
+        while m is not None and m.lastgroup == "label":
+            line_nums.append(line_num)
+            kinds.append("label")
+            heads.append(intern(m["label"]))
+            operands.append([])
+
+            line = line[m.end():].lstrip()
+            if not line:
+                break
+            m = match_line(line)
+
+        if not line:
+            continue
+
+        tokens = line.translate(commas_to_spaces).split()
+
+        if m is None:
+            kind = None
+            head = tokens[0]
+        else:
+            # Directives and mnemonics are case-insensitive. Like labels, they're interned so the strings are shared
+            # and table lookups can compare by identity
+            kind = m.lastgroup
+            head = intern(m[m.lastgroup].upper())
+
+        line_nums.append(line_num)
+        kinds.append(kind)
+        heads.append(head)
+        operands.append(tokens[1:])
+
+    return line_nums, kinds, heads, operands
+
+
+class Parser:
+    def __init__(self, source_file, digests=False):
+        self.source_file = source_file
+
+        # Each file is read in one go and split with splitlines(), which is much cheaper than reading it line by line.
+        # .INCLUDEd files are spliced in where they're included, so the result is a single stream with one entry per
+        # non-empty line, kept as parallel arrays:
+        #   file_ids  - array('I') of indexes into files
+        #   line_nums - array('I') of source line numbers
+        #   kinds     - "label", "directive", "mnemonic" or None if invalid
+        #   heads     - Label name, or upper-cased directive/mnemonic
+        #   operands  - Remaining tokens on the line
+        self.files = []                             # Display name of each file
+        self.file_ids = array('I')
+        self.line_nums = array('I')
+        self.kinds = []
+        self.heads = []
+        self.operands = []
+
+        self.digests = {} if digests else None      # Absolute path -> hash of every file read, None unless asked for
+
+        self._file_ids = {}                         # Absolute path -> index into files
+        self._parsed = {}                           # Absolute path -> columns, so repeated includes are parsed once
+        self._include_stack = []                    # Absolute paths of the files currently being included
+
+        self._add_file(source_file, os.path.abspath(source_file))
+
+    def _add_file(self, source_file, abs_path):
+        columns = self._parsed.get(abs_path)
+        if columns is None:
+            data = Path(source_file).read_bytes()
+            if self.digests is not None:
+                self.digests[abs_path] = hashlib.blake2b(data, digest_size=16).hexdigest()
+            columns = self._parsed[abs_path] = _parse_lines(data.decode())
+        line_nums, kinds, heads, operands = columns
+
+        file_id = self._file_ids.get(abs_path)
+        if file_id is None:
+            file_id = self._file_ids[abs_path] = len(self.files)
+            self.files.append(os.path.basename(source_file))
+
+        self._include_stack.append(abs_path)
+
+        # Copy across everything between .INCLUDEs in bulk
+        start = 0
+        idx = -1
+        while True:
+            try:
+                idx = heads.index(_INCLUDE, idx + 1)
+            except ValueError:
+                break
+
+            self._extend(file_id, columns, start, idx)
+            self._include(file_id, operands[idx], line_nums[idx])
+            start = idx + 1
+
+        self._extend(file_id, columns, start, len(heads))
+        self._include_stack.pop()
+
+    def _extend(self, file_id, columns, start, end):
+        if start == end:
+            return
+
+        line_nums, kinds, heads, operands = columns
+        self.file_ids.extend(array('I', [file_id]) * (end - start))
+        self.line_nums.extend(line_nums[start:end])
+        self.kinds.extend(kinds[start:end])
+        self.heads.extend(heads[start:end])
+        self.operands.extend(operands[start:end])
+
+    def _include(self, file_id, operands, line_num):
+        if len(operands) != 1:
+            raise AssemblerError(self.files[file_id], line_num, "Expected .INCLUDE \"file\"", -1)
+
+        # Included files are relative to the file including them
+        source_file = os.path.join(os.path.dirname(self._include_stack[-1]), operands[0].strip('"'))
+        abs_path = os.path.abspath(source_file)
+
+        if abs_path in self._include_stack:
+            raise AssemblerError(self.files[file_id], line_num, f"{operands[0]} includes itself", -1)
+
+        try:
+            self._add_file(source_file, abs_path)
+        except OSError:
+            raise AssemblerError(
+                self.files[file_id], line_num, f"Unable to open included file {operands[0]}", -1
+            ) from None
+        except UnicodeDecodeError:
+            raise AssemblerError(
+                self.files[file_id], line_num, f"Unable to decode included file {operands[0]}", -1
+            ) from None
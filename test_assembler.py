@@ -0,0 +1,108 @@
+import contextlib
+import io
+import os
+import struct
+import tempfile
+import unittest
+
+from assembler import Assembler
+
+
+def assemble(source):
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        source_file = os.path.join(tmp_dir, "test.s")
+        with open(source_file, 'w') as file:
+            file.write(source)
+
+        Assembler().assemble(source_file)
+        with open(os.path.join(tmp_dir, "test.out"), 'rb') as file:
+            data = file.read()
+
+    return list(struct.unpack(f"<{len(data) // 4}I", data))
+
+
+class EncodingTest(unittest.TestCase):
+    def assertEncodes(self, source, *words):
+        self.assertEqual(assemble(source), list(words), source)
+
+    def assertRejects(self, source):
+        with contextlib.redirect_stderr(io.StringIO()), self.assertRaises(SystemExit):
+            assemble(source)
+
+    def test_data_processing(self):
+        self.assertEncodes("MOV R0, R1", 0xE1A00001)
+        self.assertEncodes("MOV R0, #1", 0xE3A00001)
+        self.assertEncodes("ADD R0, R0, #1", 0xE2800001)
+        self.assertEncodes("ADDS R2, R3, R4", 0xE0932004)
+        self.assertEncodes("ADDEQS R2, R3, R4", 0x00932004)
+        self.assertEncodes("MOVEQ R0, R1", 0x01A00001)
+        self.assertEncodes("CMP R0, #0", 0xE3500000)
+        self.assertEncodes("CMP R1, R2", 0xE1510002)
+        self.assertRejects("MOV R0")
+        self.assertRejects("ADD R0, R16, #1")
+
+    def test_rotated_immediates(self):
+        self.assertEncodes("MOV R0, #0xFF", 0xE3A000FF)
+        self.assertEncodes("MOV R0, #0xFF000000", 0xE3A004FF)
+        self.assertEncodes("MOV R0, #0x104", 0xE3A00F41)
+        self.assertRejects("MOV R0, #0x101")
+
+    def test_shifts(self):
+        self.assertEncodes("MOV R0, R1, LSL #2", 0xE1A00101)
+        self.assertEncodes("MOV R0, R1, LSL#2", 0xE1A00101)
+        self.assertEncodes("MOV R0, R1, LSR #1", 0xE1A000A1)
+        self.assertEncodes("MOV R0, R1, ASR #31", 0xE1A00FC1)
+        self.assertEncodes("MOV R0, R1, ROR #8", 0xE1A00461)
+        self.assertEncodes("MOV R0, R1, RRX", 0xE1A00061)
+        self.assertEncodes("MOV R0, R1, LSL R2", 0xE1A00211)
+        self.assertEncodes("MOV R0, R1, ASR R2", 0xE1A00251)
+
+        # Shifts by 0 are LSL #0, LSR/ASR #32 are encoded as 0
+        self.assertEncodes("MOV R0, R1, LSR #0", 0xE1A00001)
+        self.assertEncodes("MOV R0, R1, ASR #0", 0xE1A00001)
+        self.assertEncodes("MOV R0, R1, ROR #0", 0xE1A00001)
+        self.assertEncodes("MOV R0, R1, LSR #32", 0xE1A00021)
+        self.assertEncodes("MOV R0, R1, ASR #32", 0xE1A00041)
+        self.assertRejects("MOV R0, R1, LSL #32")
+        self.assertRejects("MOV R0, R1, ROR #32")
+        self.assertRejects("MOV R0, R1, LSL #-1")
+
+    def test_branches(self):
+        self.assertEncodes("B next\nnext:", 0xEAFFFFFF)
+        self.assertEncodes("loop:\nMOV R0, R1\nB loop", 0xE1A00001, 0xEAFFFFFD)
+        self.assertEncodes("BL func\nMOV R0, R1\nMOV R0, R1\nMOV R0, R1\nfunc:",
+                           0xEB000002, 0xE1A00001, 0xE1A00001, 0xE1A00001)
+        self.assertEncodes("BNE next\nnext:", 0x1AFFFFFF)
+        self.assertEncodes("BLT next\nnext:", 0xBAFFFFFF)
+        self.assertRejects("B nowhere")
+        self.assertRejects("B 08")
+
+    def test_data(self):
+        self.assertEncodes(".WORD 1, 0x10, -1", 0x1, 0x10, 0xFFFFFFFF)
+        self.assertEncodes(".HWORD 1, 2", 0x00020001)
+        self.assertEncodes("start:\n.WORD start, end\nend:", 0x0, 0x8)
+        self.assertRejects(".WORD 08")
+        self.assertRejects(".WORD 1abc")
+        self.assertRejects(".BYTE 256")
+
+
+class OutputTest(unittest.TestCase):
+    def test_failed_run_keeps_existing_output(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            source_file = os.path.join(tmp_dir, "test.s")
+            output_file = os.path.join(tmp_dir, "test.out")
+            with open(source_file, 'w') as file:
+                file.write("MOV R0")
+            with open(output_file, 'wb') as file:
+                file.write(b"old")
+
+            with contextlib.redirect_stderr(io.StringIO()), self.assertRaises(SystemExit):
+                Assembler().assemble(source_file, output_file)
+
+            with open(output_file, 'rb') as file:
+                self.assertEqual(file.read(), b"old")
+            self.assertEqual(sorted(os.listdir(tmp_dir)), ["test.out", "test.s"])
+
+
+if __name__ == "__main__":
+    unittest.main()